@@ -1,46 +1,61 @@
 #!/usr/bin/env python3
 # Purpose: toy Vandermonde R×R check for the renormalization block.
 # Usage:   python3 src/04_renorm_matrix_demo.py <N>   # N used to list multiplicative primes
-# Prints:  det(M), cond_2(M), list of multiplicative primes; arch row at x=0.
+# Prints:  det(M), cond_2(M), singular values, list of multiplicative primes; arch row at x=0.
 # Output:  data/renorm_matrix_*.npz with matrix and analysis
 
-import sys, math
+import sys
 import numpy as np
 
-# Import save utils
-sys.path.append('src')
+# Import save utils (src/ is already on sys.path as the script's directory)
 from save_utils import save_numpy_results
 
 # Toy Vandermonde demo for R x R nonsingularity.
 # Interpret the arch row as evaluation at x=0; multiplicative rows at x=log ell.
 
+# trial division by 2, 3, 5, then by a 2-3-5 wheel (skips multiples of 2, 3, 5)
+WHEEL = (4, 2, 4, 2, 4, 6, 2, 6)
+
+def multiplicative_primes(N):
+    """Return the primes dividing N in ascending order (plain Python, any size of N)."""
+    m_primes = []
+    q = N
+    for p in (2, 3, 5):
+        if q % p == 0:
+            m_primes.append(p)
+            while q % p == 0: q //= p
+    p, i = 7, 0
+    while p*p <= q:
+        if q % p == 0:
+            m_primes.append(p)
+            while q % p == 0: q //= p
+        p += WHEEL[i]
+        i = (i + 1) & 7
+    if q > 1: m_primes.append(q)
+    return m_primes
+
+def renorm_matrix(primes):
+    """Return (x values, M) with M[i,k] = x_i**k for a float array of primes."""
+    # arch at x=0, then log ell for each multiplicative prime
+    xs = np.concatenate((np.zeros(1), np.log(primes)))
+    M = np.vander(xs, len(xs), increasing=True)
+    return xs, M
+
 N = int(sys.argv[1]) if len(sys.argv) > 1 else 11
-# list multiplicative primes dividing N
-m_primes = []
-q = N
-p = 2
-while p*p <= q:
-    while q % p == 0:
-        if p not in m_primes: m_primes.append(p)
-        q //= p
-    p += 1
-if q > 1: m_primes.append(q)
-
-R = 1 + len(m_primes)
-xs = [0.0] + [math.log(float(l)) for l in m_primes]  # arch at x=0
-M = np.zeros((R,R))
-for i,x in enumerate(xs):
-    for k in range(R):
-        M[i,k] = (x**k)
-
-cond = np.linalg.cond(M)
-Det = np.linalg.det(M)
+if N < 1:
+    sys.exit("Usage: python3 src/04_renorm_matrix_demo.py <N>   # N must be a positive integer")
+m_primes = multiplicative_primes(N)
+xs, M = renorm_matrix(np.array([float(l) for l in m_primes], dtype=np.float64))
+R = len(xs)
+
+# One SVD gives both cond_2 and |det|. xs is strictly increasing (0, then log ell
+# for ascending primes), so the Vandermonde determinant prod(x_j - x_i) is positive.
+sigma = np.linalg.svd(M, compute_uv=False)
+cond = sigma[0] / sigma[-1]
+Det = np.prod(sigma)
 print(f"[04] R={R}, multiplicative primes={m_primes}")
 print(f"     det(M)={Det:.6e},  cond_2(M)={cond:.3e}  (Vandermonde style)")
-
-# Compute eigenvalues
-eigenvals = np.linalg.eigvals(M)
-print(f"     eigenvalues: {eigenvals}")
+print(f"     singular values: {sigma}")
 
 # Save results
 metadata = {
@@ -54,8 +69,8 @@ metadata = {
 
 arrays = {
     'matrix': M,
-    'eigenvalues': eigenvals,
-    'x_values': np.array(xs)
+    'singular_values': sigma,
+    'x_values': xs
 }
 
 filename = save_numpy_results('renorm_matrix', arrays, metadata)
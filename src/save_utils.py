@@ -4,19 +4,51 @@ Utility functions for saving BSD computation results.
 Compatible with both Python and Sage environments.
 """
 
+import base64
+import io
 import json
+import math
 import os
+from contextlib import contextmanager
 from datetime import datetime
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import blosc2
+except ImportError:
+    blosc2 = None
+
 def ensure_data_dir():
     """Ensure data directory exists."""
     os.makedirs('data', exist_ok=True)
 
+@contextmanager
+def atomic_open(filename, mode='w'):
+    """Open filename + '.tmp' for writing and move it into place on success."""
+    tmp = filename + '.tmp'
+    try:
+        with open(tmp, mode) as f:
+            yield f
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+_COMPLEX_TYPES = (complex, np.complex64, np.complex128)
+
 def complex_to_dict(z):
     """Convert complex number to serializable dict."""
+    # Python/NumPy complex: real and imag are attributes
+    if isinstance(z, _COMPLEX_TYPES):
+        return {'real': float(z.real), 'imag': float(z.imag)}
     if hasattr(z, 'real') and hasattr(z, 'imag'):
-        # For numpy complex numbers, real and imag are attributes, not methods
+        # Sage complex numbers expose real() and imag() as methods
         if callable(getattr(z, 'real')):
             return {'real': float(z.real()), 'imag': float(z.imag())}
         else:
@@ -24,16 +56,60 @@ def complex_to_dict(z):
     else:
         return {'real': float(z), 'imag': 0.0}
 
+# Arrays with more elements than this are stored as base64-encoded .npy bytes
+# instead of nested lists (decode with view_results.get_value)
+NPY_INLINE_MAX = 1024
+
+def _serialize_array(v):
+    if v.size <= NPY_INLINE_MAX or v.dtype.hasobject:
+        return v.tolist()
+    buf = io.BytesIO()
+    np.save(buf, v, allow_pickle=False)
+    return {'__npy_b64__': base64.b64encode(buf.getvalue()).decode('ascii')}
+
+def _serialize_list(v):
+    return [serialize_value(x) for x in v]
+
+def _serialize_dict(v):
+    return {k: serialize_value(val) for k, val in v.items()}
+
+# Exact-type fast path for the common leaf and container types; anything not
+# listed here (subclasses, Sage types) goes through the isinstance cascade.
+_DISPATCH = {
+    type(None): lambda v: None,
+    int: int,
+    float: float,
+    str: lambda v: v,
+    list: _serialize_list,
+    tuple: _serialize_list,
+    dict: _serialize_dict,
+    complex: complex_to_dict,
+    np.int64: int,
+    np.float64: float,
+    np.complex128: complex_to_dict,
+    np.ndarray: _serialize_array,
+}
+
+def _all_finite(v):
+    """True if no float in a serialize_value() result is NaN or infinite."""
+    if isinstance(v, float):
+        return math.isfinite(v)
+    if isinstance(v, list):
+        return all(_all_finite(x) for x in v)
+    if isinstance(v, dict):
+        return all(_all_finite(x) for x in v.values())
+    return True
+
 def serialize_value(v):
     """Convert Sage/Python values to JSON-serializable format."""
+    handler = _DISPATCH.get(type(v))
+    if handler is not None:
+        return handler(v)
     # Handle None
     if v is None:
         return None
-    # Check if it's a numpy complex type
-    if isinstance(v, (np.complex64, np.complex128)):
-        return complex_to_dict(v)
-    # Check if it's Python's complex type
-    elif isinstance(v, complex):
+    # Check if it's a Python or numpy complex type
+    if isinstance(v, _COMPLEX_TYPES):
         return complex_to_dict(v)
     # Check if Sage complex number (has imag() method, not property)
     elif hasattr(v, 'imag') and callable(getattr(v, 'imag', None)):
@@ -42,11 +118,11 @@ def serialize_value(v):
         # Sage number - convert to float
         return float(v.numerical_approx())
     elif isinstance(v, (list, tuple)):
-        return [serialize_value(x) for x in v]
+        return _serialize_list(v)
     elif isinstance(v, dict):
-        return {k: serialize_value(val) for k, val in v.items()}
+        return _serialize_dict(v)
     elif isinstance(v, np.ndarray):
-        return v.tolist()
+        return _serialize_array(v)
     elif isinstance(v, (int, np.integer)):
         return int(v)
     elif isinstance(v, (float, np.floating)):
@@ -72,48 +148,88 @@ def save_json_results(filename_base, data_dict, curve_label=None):
     """
     ensure_data_dir()
     
+    # One clock read so the filename and metadata timestamps agree
+    now = datetime.now()
+    
     # Add metadata
     data_dict['metadata'] = {
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': now.isoformat(),
         'curve': curve_label if curve_label else 'unknown'
     }
     
-    # Serialize all values
-    serialized = serialize_value(data_dict)
-    
     # Create filename with timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
     if curve_label:
         filename = f"data/{filename_base}_{curve_label}_{timestamp}.json"
     else:
         filename = f"data/{filename_base}_{timestamp}.json"
     
-    # Save
-    with open(filename, 'w') as f:
-        json.dump(serialized, f, indent=2)
+    # Serialize all values, then encode. orjson only does the encoding, so
+    # both writers see the same input; it writes NaN/Infinity as null, so
+    # payloads with non-finite floats keep using json.dumps.
+    serialized = serialize_value(data_dict)
+    payload = None
+    if orjson is not None and _all_finite(serialized):
+        try:
+            payload = orjson.dumps(serialized, option=orjson.OPT_INDENT_2
+                                   | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            payload = None
+    if payload is None:
+        payload = json.dumps(serialized, indent=2).encode()
+    with atomic_open(filename, 'wb') as f:
+        f.write(payload)
     
     return filename
 
-def save_numpy_results(filename_base, arrays_dict, metadata=None):
+def save_numpy_results(filename_base, arrays_dict, metadata=None, compressed=False):
     """
-    Save numpy arrays to .npz file.
+    Save numpy arrays to .npz file, with metadata in a JSON sidecar.
+    
+    The archive holds only numeric arrays, so it can be read back with
+    np.load(..., allow_pickle=False). Metadata, if given, is written next to
+    it as <filename_base>_<timestamp>.meta.json.
+    
+    With compressed=True (and blosc2 installed) each array is instead written
+    LZ4-compressed to <filename_base>_<timestamp>.<name>.bl2, and a
+    <filename_base>_<timestamp>.bl2.json index lists the array names.
     
     Args:
         filename_base: Base name for file
         arrays_dict: Dictionary of numpy arrays
         metadata: Optional metadata dict
+        compressed: Use blosc2 instead of .npz (falls back to .npz if
+            blosc2 is not installed)
     
     Returns:
-        Path to saved file
+        Path to saved file (the .npz archive or the .bl2.json index)
     """
     ensure_data_dir()
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"data/{filename_base}_{timestamp}.npz"
+    stem = f"data/{filename_base}_{timestamp}"
     
-    # Add metadata as array if provided
+    if compressed and blosc2 is None:
+        print("[save_utils] blosc2 not installed, saving uncompressed .npz")
+        compressed = False
+    
+    # Metadata goes to a sidecar instead of a string array inside the archive;
+    # it is written first so readers never see an archive without it
     if metadata:
-        arrays_dict['metadata'] = np.array([json.dumps(serialize_value(metadata))])
+        with atomic_open(f"{stem}.meta.json") as f:
+            json.dump(serialize_value(metadata), f, indent=2)
+    
+    if compressed:
+        cparams = {'codec': blosc2.Codec.LZ4, 'clevel': 5}
+        for name, arr in arrays_dict.items():
+            blosc2.save_array(np.ascontiguousarray(arr), f"{stem}.{name}.bl2",
+                              mode='w', cparams=cparams)
+        filename = f"{stem}.bl2.json"
+        with atomic_open(filename) as f:
+            json.dump({'arrays': list(arrays_dict)}, f, indent=2)
+    else:
+        filename = f"{stem}.npz"
+        with atomic_open(filename, 'wb') as f:
+            np.savez(f, **arrays_dict)
     
-    np.savez(filename, **arrays_dict)
     return filename
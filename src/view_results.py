@@ -4,30 +4,95 @@ Utility to load and display saved BSD computation results.
 Usage: python3 src/view_results.py [curve_label]
 """
 
+import base64
+import io
 import json
 import numpy as np
 import os
 import sys
+from collections.abc import Mapping
+from functools import lru_cache
 from glob import glob
 from datetime import datetime
 
+def _find_latest(files):
+    """Return (path, mtime) of the most recently modified file, or (None, None)."""
+    if not files:
+        return None, None
+    mtime, latest = max((os.path.getmtime(f), f) for f in files)
+    return latest, mtime
+
+@lru_cache(maxsize=32)
+def _parse_json(path, mtime):
+    """Parse a JSON result file; mtime is part of the cache key so edits reload."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _open_npz(path):
+    """Open an NPZ file or blosc2 bundle (not cached: NpzFile holds an open zip)."""
+    if path.endswith('.bl2.json'):
+        return load_blosc2_bundle(path)
+    return np.load(path, allow_pickle=False)
+
 def load_latest_json(pattern):
     """Load the most recent JSON file matching pattern."""
-    files = glob(pattern)
-    if not files:
+    latest, mtime = _find_latest(glob(pattern))
+    if latest is None:
         return None
-    # Sort by timestamp in filename
-    files.sort(key=lambda x: x.split('_')[-1].replace('.json', ''))
-    with open(files[-1], 'r') as f:
-        return json.load(f), files[-1]
+    return _parse_json(latest, mtime), latest
 
 def load_latest_npz(pattern):
-    """Load the most recent NPZ file matching pattern."""
-    files = glob(pattern)
-    if not files:
+    """Load the most recent NPZ file (or blosc2 bundle) matching pattern."""
+    files = glob(pattern) + glob(pattern.replace('.npz', '.bl2.json'))
+    latest, _ = _find_latest(files)
+    if latest is None:
         return None
-    files.sort(key=lambda x: x.split('_')[-1].replace('.npz', ''))
-    return np.load(files[-1]), files[-1]
+    return _open_npz(latest), latest
+
+class Blosc2Bundle(Mapping):
+    """Read-only view of a blosc2 bundle; arrays are decompressed on first access.
+
+    Like np.load on an .npz, only the members that are actually used are read.
+    """
+
+    def __init__(self, index_file):
+        with open(index_file, 'r') as f:
+            self.files = json.load(f)['arrays']
+        self._stem = index_file[:-len('.bl2.json')]
+        self._loaded = {}
+
+    def __getitem__(self, name):
+        if name not in self.files:
+            raise KeyError(name)
+        if name not in self._loaded:
+            import blosc2
+            self._loaded[name] = blosc2.load_array(f"{self._stem}.{name}.bl2")
+        return self._loaded[name]
+
+    def __contains__(self, name):
+        return name in self.files
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+def load_blosc2_bundle(index_file):
+    """Open the arrays listed in a .bl2.json index written by save_numpy_results."""
+    return Blosc2Bundle(index_file)
+
+def load_npz_metadata(npz_data, fname):
+    """Load metadata for an NPZ file or blosc2 bundle from its .meta.json sidecar."""
+    stem = fname[:-len('.bl2.json')] if fname.endswith('.bl2.json') else fname[:-len('.npz')]
+    meta_file = stem + '.meta.json'
+    if os.path.exists(meta_file):
+        with open(meta_file, 'r') as f:
+            return json.load(f)
+    # Older archives embedded metadata as a JSON string array
+    if 'metadata' in npz_data:
+        return json.loads(str(npz_data['metadata'][0]))
+    return {}
 
 def print_section(title):
     """Print a section header."""
@@ -39,9 +104,19 @@ def get_value(val):
     """Extract numeric value from either float or dict format."""
     if isinstance(val, dict) and 'real' in val:
         return val['real']
+    if isinstance(val, dict) and '__npy_b64__' in val:
+        # Large array saved as base64-encoded .npy bytes
+        raw = base64.b64decode(val['__npy_b64__'])
+        return np.load(io.BytesIO(raw), allow_pickle=False)
     return val
 
+def print_lines(lines):
+    """Print a list of lines with a single write (nothing if empty)."""
+    if lines:
+        print('\n'.join(lines))
+
 def main(curve='37a1'):
+    gv = get_value
     print(f"BSD Results Viewer - Curve: {curve}")
     
     # 1. Principal Part Results
@@ -62,8 +137,8 @@ def main(curve='37a1'):
         log_det = data['results']['log_det_fin']
         print(f"  log det_fin = {log_det['real']:.6f}")
         print(f"\nSlope checks:")
-        for check in data['slope_checks']:
-            print(f"  h={check['h']:.4f}: slope = {check['slope']:.4f}")
+        print_lines([f"  h={check['h']:.4f}: slope = {check['slope']:.4f}"
+                     for check in data['slope_checks']])
     
     # 2. Gap Polynomial Results
     result = load_latest_json(f'data/gap_poly_{curve}_*.json')
@@ -75,11 +150,10 @@ def main(curve='37a1'):
         print(f"  Mmax = {data['parameters']['Mmax']}")
         print(f"  Number of features = {len(data['features'])}")
         print(f"  Number of newforms = {data['curve_data']['num_newforms']}")
-        print(f"\nSpectral gap: δ = {get_value(data['spectral_gap']):.6f}")
-        print(f"P(f) = {get_value(data['P_values']['f']):.6f}")
-        for key, val in data['P_values'].items():
-            if key != 'f':
-                print(f"|P({key})| = {get_value(val):.6f}")
+        print(f"\nSpectral gap: δ = {gv(data['spectral_gap']):.6f}")
+        print(f"P(f) = {gv(data['P_values']['f']):.6f}")
+        print_lines([f"|P({key})| = {gv(val):.6f}"
+                     for key, val in data['P_values'].items() if key != 'f'])
     
     # 3. BSD Components
     result = load_latest_json(f'data/bsd_components_{curve}_*.json')
@@ -99,8 +173,8 @@ def main(curve='37a1'):
         print(f"  Product of Tamagawa numbers = {comp['tamagawa_product']}")
         if comp['generators']:
             print(f"\nGenerators:")
-            for g in comp['generators']:
-                print(f"  {g['point']} (height = {g['height']:.6f})")
+            print_lines([f"  {g['point']} (height = {g['height']:.6f})"
+                         for g in comp['generators']])
         if data['L_series']['L_r_over_r_factorial'] is not None:
             print(f"\nL-series value:")
             print(f"  L^({comp['rank']})(E,1)/{comp['rank']}! = {data['L_series']['L_r_over_r_factorial']:.6f}")
@@ -111,16 +185,22 @@ def main(curve='37a1'):
     result = load_latest_npz('data/renorm_matrix_*.npz')
     if result:
         npz_data, fname = result
-        metadata = json.loads(str(npz_data['metadata'][0]))
+        metadata = load_npz_metadata(npz_data, fname)
         print_section(f"Renormalization Matrix ({fname})")
         print(f"N = {metadata['N']}")
         print(f"Dimension R = {metadata['R']}")
         print(f"Multiplicative primes: {metadata['multiplicative_primes']}")
         print(f"Determinant = {metadata['determinant']:.6e}")
         print(f"Condition number = {metadata['condition_number']:.3e}")
-        print(f"\nEigenvalues:")
-        for i, ev in enumerate(npz_data['eigenvalues']):
-            print(f"  λ_{i+1} = {ev:.6f}")
+        if 'singular_values' in npz_data:
+            print(f"\nSingular values:")
+            print_lines([f"  σ_{i+1} = {sv:.6f}"
+                         for i, sv in enumerate(npz_data['singular_values'])])
+        else:
+            # Older archives stored eigenvalues instead
+            print(f"\nEigenvalues:")
+            print_lines([f"  λ_{i+1} = {ev:.6f}"
+                         for i, ev in enumerate(npz_data['eigenvalues'])])
 
 if __name__ == "__main__":
     curve = sys.argv[1] if len(sys.argv) > 1 else '37a1'
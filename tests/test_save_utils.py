@@ -0,0 +1,80 @@
+"""Tests for save_utils: JSON writers with/without orjson and large-array encoding."""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import save_utils
+import view_results
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+requires_orjson = pytest.mark.skipif(orjson is None, reason='orjson not installed')
+
+
+def _save_both(monkeypatch, tmp_path, data):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(save_utils, 'orjson', orjson)
+    with_orjson = save_utils.save_json_results('t', dict(data), 'orjson')
+    monkeypatch.setattr(save_utils, 'orjson', None)
+    with_json = save_utils.save_json_results('t', dict(data), 'json')
+    loaded = []
+    for fname in (with_orjson, with_json):
+        with open(fname, 'r', encoding='utf-8') as f:
+            d = json.load(f)
+        del d['metadata']
+        loaded.append(d)
+    return loaded
+
+
+@requires_orjson
+@pytest.mark.parametrize('data', [
+    {'a': np.float64('nan'), 'b': float('inf'), 'c': -np.inf, 'd': True},
+    {'x': [1, 2.5, 'x', None, (1, 2), False], 'arr': np.arange(3),
+     'big': np.linspace(0.0, 1.0, 2000), 'z': np.complex128(1 + 2j),
+     'f32': np.float32(1.5), 'i32': np.int32(3), 'nested': {'g': 1j}},
+])
+def test_orjson_and_json_writers_agree(monkeypatch, tmp_path, data):
+    with_orjson, with_json = _save_both(monkeypatch, tmp_path, data)
+    # json.dumps spells NaN/Infinity the same way on both sides
+    assert json.dumps(with_orjson, sort_keys=True) == json.dumps(with_json, sort_keys=True)
+
+
+@requires_orjson
+def test_non_finite_and_bool_values_survive(monkeypatch, tmp_path):
+    with_orjson, _ = _save_both(monkeypatch, tmp_path,
+                                {'a': float('nan'), 'b': float('inf'), 'd': True})
+    assert np.isnan(with_orjson['a'])
+    assert with_orjson['b'] == float('inf')
+    assert with_orjson['d'] == 1
+
+
+@pytest.mark.parametrize('writer', [
+    pytest.param(orjson, id='orjson', marks=requires_orjson),
+    pytest.param(None, id='json'),
+])
+def test_large_array_round_trips_through_npy_b64(monkeypatch, tmp_path, writer):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(save_utils, 'orjson', writer)
+    big = np.linspace(0.0, 1.0, 2000)
+    fname = save_utils.save_json_results('t', {'big': big}, 'b64')
+    with open(fname, 'r', encoding='utf-8') as f:
+        d = json.load(f)
+    assert '__npy_b64__' in d['big']
+    np.testing.assert_array_equal(view_results.get_value(d['big']), big)
+
+
+def test_inline_threshold_boundary():
+    at_limit = np.arange(save_utils.NPY_INLINE_MAX, dtype=np.float64)
+    over_limit = np.arange(save_utils.NPY_INLINE_MAX + 1, dtype=np.float64)
+    assert save_utils.serialize_value(at_limit) == at_limit.tolist()
+    encoded = save_utils.serialize_value(over_limit)
+    assert set(encoded) == {'__npy_b64__'}
+    np.testing.assert_array_equal(view_results.get_value(encoded), over_limit)